@@ -3,17 +3,21 @@
 
 import streamlit as st
 import base64
+import io
 import os
-import tempfile
-from PIL import Image
-import plotly.express as px # Added for Plotly charts
-
-# Utility Modules
-from utils.resume_parser import parse_resume
-from utils.job_matcher import match_resume_to_jd, extract_skills_from_text, compare_skills, load_spacy_model_for_job_matcher
-from utils import job_matcher # To access job_matcher.nlp_jm
+from concurrent.futures import ThreadPoolExecutor
+# Heavier modules (PIL, plotly, spaCy-backed utils) are imported where they are used,
+# so reruns of the Feedback/About pages do not pay for them.
 
 # --- Helper Functions ---
+def resume_bytes(uploaded_file):
+    """
+    Returns the full contents of a st.file_uploader upload.
+    Uses getvalue() rather than read(): read() moves the buffer's cursor, so a later read
+    on the same rerun would come back empty. Call once and reuse the result.
+    """
+    return uploaded_file.getvalue()
+
 def show_pdf_from_bytes(file_bytes, width=700, height=1000):
     base64_pdf = base64.b64encode(file_bytes).decode('utf-8')
     pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="{width}" height="{height}" type="application/pdf"></iframe>'
@@ -27,19 +31,64 @@ st.set_page_config(
 )
 
 # --- Global NLP Model Management ---
-def ensure_job_matcher_nlp_loaded():
-    """Ensures the spaCy model in job_matcher is loaded."""
-    if job_matcher.nlp_jm is None:
-        load_spacy_model_for_job_matcher() # This function is from job_matcher.py
+@st.cache_resource(show_spinner="Loading language model...")
+def get_spacy_nlp():
+    """
+    Loads the spaCy model once per process and shares it across reruns and sessions.
+    Raises on failure: Streamlit does not cache exceptions, so the next call retries the load.
+    """
+    from utils.resume_parser import load_spacy_model
+    nlp = load_spacy_model()
+    if nlp is None:
+        raise RuntimeError("spaCy model 'en_core_web_sm' not available or failed to download.")
+    return nlp
+
+# --- Analysis ---
+class ResumeParseError(Exception):
+    """Raised by analyze_resume when the resume cannot be parsed (exceptions are never cached)."""
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def analyze_resume(file_bytes, resume_name, job_description_text):
+    """
+    Parses the resume and scores it against the job description.
+    Cached on the raw upload bytes, file name and JD text, so re-analyzing the same pair is instant.
+    Returns a dict with resume_data, match_score, jd_skills and skills_comparison.
+    Raises ResumeParseError instead of returning an error so failures are retried, not cached.
+    """
+    from utils.resume_parser import parse_resume
+    from utils.job_matcher import match_resume_to_jd, extract_skills_from_text, compare_skills
+
+    # Parse straight from memory; no temporary file round-trip
+    resume_stream = io.BytesIO(file_bytes)
+    resume_stream.name = resume_name
+    resume_ext = os.path.splitext(resume_name)[1]
+
+    # JD skill extraction runs alongside resume parsing, which spends much of its time in PDFium/spaCy
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        jd_skills_future = executor.submit(extract_skills_from_text, job_description_text)
+
+        resume_data = parse_resume(resume_stream, get_spacy_nlp(), ext=resume_ext)
+        if not resume_data or "error" in resume_data:
+            raise ResumeParseError((resume_data or {}).get("error", "Unknown parsing error"))
+
+        match_score = match_resume_to_jd(resume_data.get("text", ""), job_description_text)
+
+        jd_extracted_skills = jd_skills_future.result()
+        skills_comparison = compare_skills(resume_data.get("skills", frozenset()), jd_extracted_skills)
+        return {
+            "resume_data": resume_data,
+            "match_score": match_score,
+            "jd_skills": jd_extracted_skills,
+            "skills_comparison": skills_comparison,
+        }
 
 # --- Main Application Logic ---
 def run():
-    ensure_job_matcher_nlp_loaded()
-
     # Logo
     try:
         logo_path = 'Logo/RESUM.png' # Path relative to project root
         if os.path.exists(logo_path):
+            from PIL import Image
             img = Image.open(logo_path)
             st.image(img, width=200) # Control logo width
         else:
@@ -71,28 +120,19 @@ def run():
 
         if analyze_button and uploaded_resume_file is not None and job_description_text.strip():
             with st.spinner('Processing... Please wait.'):
-                temp_file_path = None # Initialize to None
                 try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_resume_file.name)[1]) as tmp_file:
-                        tmp_file.write(uploaded_resume_file.getvalue())
-                        temp_file_path = tmp_file.name
-
-                    resume_data = parse_resume(temp_file_path)
-
-                    if not resume_data or "error" in resume_data:
-                        st.error(f"Failed to parse resume: {resume_data.get('error', 'Unknown parsing error')}")
+                    try:
+                        # Read the upload exactly once per analysis
+                        resume_file_bytes = resume_bytes(uploaded_resume_file)
+                        analysis = analyze_resume(resume_file_bytes, uploaded_resume_file.name, job_description_text)
+                    except ResumeParseError as e_parse:
+                        st.error(f"Failed to parse resume: {e_parse}")
                         return
 
-                    resume_text_content = resume_data.get("text", "")
-                    overall_match_score = match_resume_to_jd(resume_text_content, job_description_text)
-
-                    jd_extracted_skills = []
-                    if job_matcher.nlp_jm:
-                         jd_extracted_skills = extract_skills_from_text(job_description_text, job_matcher.nlp_jm)
-                    else:
-                        st.warning("Could not extract JD skills: spaCy model for Job Matcher not available.")
-
-                    skills_comparison_results = compare_skills(resume_data.get("skills", []), jd_extracted_skills)
+                    resume_data = analysis["resume_data"]
+                    overall_match_score = analysis["match_score"]
+                    jd_extracted_skills = analysis["jd_skills"]
+                    skills_comparison_results = analysis["skills_comparison"]
 
                     st.success("Analysis Complete!")
                     st.markdown("<hr/>", unsafe_allow_html=True)
@@ -126,6 +166,7 @@ def run():
                                 'Count': [num_matched_skills, num_missing_skills]
                             }
                             try:
+                                import plotly.express as px
                                 fig = px.bar(skills_chart_data, x='Category', y='Count', title='Resume vs. JD Skills Match', color='Category', color_discrete_map={'Matched Skills':'green', 'Missing Skills (from JD)':'red'})
                                 fig.update_layout(showlegend=False)
                                 st.plotly_chart(fig, use_container_width=True)
@@ -135,25 +176,19 @@ def run():
                             st.info("No skills parsed from Job Description to generate a chart.")
 
                         st.markdown("**🛠️ Skills from Resume:**")
-                        st.info(", ".join(resume_data.get("skills", ["N/A"])))
+                        st.info(", ".join(sorted(resume_data.get("skills", ()))) or "No specific skills found from the predefined list")
 
                         st.markdown("**🎯 Skills Parsed from JD:**")
-                        st.text(", ".join(jd_extracted_skills if jd_extracted_skills else ["N/A"]))
+                        st.text(", ".join(sorted(skills_comparison_results.get('jd_skills_parsed', []))) or "N/A")
 
                         st.markdown("**✅ Matched Skills:**")
-                        st.success(", ".join(skills_comparison_results.get('matched_skills', ["N/A"])) )
+                        st.success(", ".join(sorted(skills_comparison_results.get('matched_skills', []))) or "N/A")
 
                         st.markdown("**⚠️ Missing Skills (for JD):**")
-                        st.warning(", ".join(skills_comparison_results.get('missing_skills', ["N/A"])) )
+                        st.warning(", ".join(sorted(skills_comparison_results.get('missing_skills', []))) or "N/A")
 
                 except Exception as e:
                     st.error(f"An unexpected error occurred during analysis: {e}")
-                finally:
-                    if temp_file_path and os.path.exists(temp_file_path):
-                        try:
-                            os.remove(temp_file_path)
-                        except Exception as e_remove:
-                            st.error(f"Error removing temporary file: {e_remove}")
 
         elif analyze_button:
             if uploaded_resume_file is None: st.warning("Please upload your resume.")
@@ -182,7 +217,7 @@ def run():
         <p align='justify'>
             This tool leverages Natural Language Processing to parse resumes and match them against job descriptions.
             It extracts key candidate information, identifies relevant skills, and provides a similarity score to help assess fit.
-            This version has been re-engineered by Jules for improved stability and accuracy using spaCy and scikit-learn.
+            This version has been re-engineered by Jules for improved stability and accuracy using spaCy.
         </p>
         <p align="justify">
             <b>How to use:</b> <br/>
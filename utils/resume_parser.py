@@ -1,216 +1,316 @@
-import io
 import re
-from pdfminer.converter import TextConverter
-from pdfminer.pdfinterp import PDFPageInterpreter
-from pdfminer.pdfinterp import PDFResourceManager
-from pdfminer.layout import LAParams
-from pdfminer.pdfpage import PDFPage
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pypdfium2 as pdfium
 from docx import Document
 import spacy
-from spacy.matcher import Matcher
+try:
+    from utils.skills_vocab import find_skills
+except ModuleNotFoundError: # Running this file directly, e.g. python utils/resume_parser.py
+    from skills_vocab import find_skills
 import os # Added for __main__ example cleanup
 
-# nlp object will be loaded in the parse_resume function when first needed
-nlp = None
-
-def extract_text_from_pdf(pdf_path):
-    """Extracts text from a PDF file."""
-    resource_manager = PDFResourceManager()
-    fake_file_handle = io.StringIO()
-    converter = TextConverter(resource_manager, fake_file_handle, laparams=LAParams())
-    page_interpreter = PDFPageInterpreter(resource_manager, converter)
-
+# Serialises all PDFium calls in this process (the library is not thread-safe)
+_PDFIUM_LOCK = threading.Lock()
+
+# Precompiled patterns for contact details
+# Improved regex for common email patterns
+_EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+# Regex to find various phone number formats (North American focus, can be adapted)
+_PHONE_RE = re.compile(r"(\+?\d{1,3}[-\.\s]?)?(\(\d{3}\)|\d{3})[-\.\s]?\d{3}[-\.\s]?\d{4}")
+_NON_DIGIT = re.compile(r"[^0-9]")
+# A header line made up only of 2-4 capitalised words, e.g. "Jane Doe"
+_NAME_LINE_RE = re.compile(r"^\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\s*$")
+# Heading and job-title words the name regex would otherwise accept, e.g. "Software Engineer"
+_NOT_A_NAME_WORDS = {
+    "resume", "curriculum", "vitae", "cv", "summary", "experience", "work", "professional",
+    "profile", "objective", "education", "skills", "contact", "personal", "details",
+    "information", "engineer", "developer", "manager", "analyst", "designer", "consultant",
+    "intern", "scientist", "architect", "administrator", "of",
+}
+# Names sit at the top of a resume; only this many non-empty lines are searched
+NAME_HEADER_LINES = 5
+# Lines mentioning any of these keywords are treated as education details
+_EDUCATION_RE = re.compile(
+    r"\b(?:education|university|college|institute|bachelor|master|phd|"
+    r"degree|qualification|academic|school|cgpa|gpa)s?\b",
+    re.IGNORECASE,
+)
+
+# Only NER (names) is used; it has its own internal tok2vec in en_core_web_sm, so the
+# shared tok2vec is not needed either. Excluded components are never loaded.
+EXCLUDED_PIPES = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter']
+
+def _load_trimmed(model_name):
+    """Loads the model without the components the parser does not use."""
+    return spacy.load(model_name, exclude=EXCLUDED_PIPES)
+
+def load_spacy_model(model_name='en_core_web_sm'):
+    """Loads the spaCy model, downloading it first if it is missing. Returns None on failure."""
     try:
-        with open(pdf_path, 'rb') as fh:
-            for page in PDFPage.get_pages(fh,
-                                          caching=True,
-                                          check_extractable=True):
-                page_interpreter.process_page(page)
-            text = fake_file_handle.getvalue()
-    except Exception as e:
-        print(f"Error reading PDF file {pdf_path}: {e}")
-        return None
-    finally:
-        converter.close()
-        fake_file_handle.close()
-
-    return text
+        nlp = _load_trimmed(model_name)
+        print(f"spaCy model '{model_name}' loaded successfully for parsing.")
+        return nlp
+    except OSError:
+        print(f"CRITICAL: Failed to load spaCy model '{model_name}'. Make sure it's installed.")
+        print(f"Attempting to download and load {model_name}...")
+        try:
+            spacy.cli.download(model_name)
+            nlp = _load_trimmed(model_name)
+            print(f"Successfully downloaded and loaded '{model_name}'.")
+            return nlp
+        except Exception as e:
+            print(f"Still failed to load spaCy model after download attempt: {e}")
+    except Exception as e: # Catch any other spacy.load exception
+        print(f"An unexpected error occurred while loading spaCy model: {e}")
+    return None
+
+def _source_name(source):
+    """Returns a printable name for a file path or file-like object."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return getattr(source, "name", "<in-memory file>")
+
+def extract_text_from_pdf(pdf_source):
+    """
+    Extracts text from a PDF file path or binary file-like object (e.g. io.BytesIO) using PDFium.
+    Returns {"text": ..., "n_pages": ...} from a single pass over the document, or None on failure.
+    """
+    # PDFium is not thread-safe and Streamlit runs each session on its own thread
+    with _PDFIUM_LOCK:
+        try:
+            pdf = pdfium.PdfDocument(pdf_source)
+        except Exception as e:
+            print(f"Error reading PDF file {_source_name(pdf_source)}: {e}")
+            return None
 
-def extract_text_from_docx(docx_path):
-    """Extracts text from a DOCX file."""
+        try:
+            n_pages = len(pdf)
+            pages_text = []
+            for page in pdf:
+                text_page = page.get_textpage()
+                pages_text.append(text_page.get_text_range())
+                text_page.close()
+                page.close()
+            # PDFium reports CRLF line breaks; normalise to match the DOCX extractor
+            return {"text": "\n".join(pages_text).replace("\r\n", "\n"), "n_pages": n_pages}
+        except Exception as e:
+            print(f"Error reading PDF file {_source_name(pdf_source)}: {e}")
+            return None
+        finally:
+            pdf.close()
+
+def extract_text_from_docx(docx_source):
+    """Extracts text from a DOCX file path or binary file-like object."""
     try:
-        doc = Document(docx_path)
+        doc = Document(docx_source)
         full_text = []
         for para in doc.paragraphs:
             full_text.append(para.text)
         return '\n'.join(full_text)
     except Exception as e:
-        print(f"Error reading DOCX file {docx_path}: {e}")
+        print(f"Error reading DOCX file {_source_name(docx_source)}: {e}")
         return None
 
-def extract_text_from_file(file_path):
-    """Extracts text from PDF or DOCX file based on extension."""
-    if not file_path: # Handle cases where file_path might be None
-        print("Error: No file path provided for text extraction.")
+def extract_text_from_file(source, ext=None):
+    """
+    Extracts text from a PDF or DOCX file path or binary stream.
+    The format comes from `ext` (e.g. ".pdf") when given, otherwise from the path/stream name.
+    Returns {"text": ..., "n_pages": ...} (n_pages is None for DOCX, which has no fixed pagination),
+    or None on failure.
+    """
+    if not source: # Handle cases where source might be None
+        print("Error: No file provided for text extraction.")
         return None
-    if file_path.endswith(".pdf"):
-        return extract_text_from_pdf(file_path)
-    elif file_path.endswith(".docx"):
-        return extract_text_from_docx(file_path)
+    if ext is None:
+        ext = os.path.splitext(_source_name(source))[1]
+    ext = ext.lower()
+    if ext == ".pdf":
+        return extract_text_from_pdf(source)
+    elif ext == ".docx":
+        text = extract_text_from_docx(source)
+        return {"text": text, "n_pages": None} if text is not None else None
     else:
-        print(f"Unsupported file format: {file_path}. Only PDF and DOCX are supported.")
+        print(f"Unsupported file format: {_source_name(source)}. Only PDF and DOCX are supported.")
         return None
 
 # --- spaCy based extraction functions ---
 
-def extract_name(text_doc): # Expects a spaCy Doc object
-    """Extracts name using spaCy's NER (PERSON entities)."""
-    if text_doc is None:
-        return "Name Not Found (No document processed)"
-    for ent in text_doc.ents:
+def _name_header(text):
+    """Returns the first NAME_HEADER_LINES non-empty lines of the resume, stripped."""
+    return [line.strip() for line in text.splitlines() if line.strip()][:NAME_HEADER_LINES]
+
+def _name_from_doc(doc):
+    """Returns the first PERSON entity in a processed header, or None."""
+    for ent in doc.ents:
         if ent.label_ == "PERSON":
             # Could add more logic here to find the most likely candidate if multiple PERSON entities exist
             return ent.text.strip()
+    return None
+
+def _name_from_lines(header_lines):
+    """Returns the first header line made up only of capitalised, non-heading words, or None."""
+    for line in header_lines:
+        match = _NAME_LINE_RE.match(line)
+        if match and not _NOT_A_NAME_WORDS.intersection(match.group(1).lower().split()):
+            return match.group(1)
+    return None
+
+def extract_name(text, nlp, header_doc=None): # Expects raw text and a spaCy pipeline with NER
+    """
+    Extracts the candidate's name from the resume header.
+    Runs spaCy NER (PERSON entities) over the first few lines instead of the whole document,
+    then falls back to the first header line made up only of capitalised, non-heading words.
+    `header_doc` is the header already run through `nlp`, e.g. by nlp.pipe over a batch.
+    """
+    if text is None:
+        return "Name Not Found (No text provided)"
+    header_lines = _name_header(text)
+    if not header_lines:
+        return "Name Not Found"
+
+    if header_doc is None and nlp is not None:
+        header_doc = nlp("\n".join(header_lines))
+    name = (_name_from_doc(header_doc) if header_doc is not None else None) or _name_from_lines(header_lines)
+    if name:
+        return name
+    if nlp is None:
+        return "Name Not Found (No document processed)"
     return "Name Not Found"
 
 def extract_email(text): # Expects raw text
     """Extracts email using a regex pattern."""
     if text is None:
         return "Email Not Found (No text provided)"
-    # Improved regex for common email patterns
-    email_regex = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-    matches = re.findall(email_regex, text)
-    return matches[0] if matches else "Email Not Found"
+    match = _EMAIL_RE.search(text) # Stops at the first hit instead of scanning the whole text
+    return match.group(0) if match else "Email Not Found"
 
 def extract_phone(text): # Expects raw text
     """Extracts phone number using a more comprehensive regex pattern."""
     if text is None:
         return "Phone Not Found (No text provided)"
-    # Regex to find various phone number formats (North American focus, can be adapted)
-    phone_regex = r"(\+?\d{1,3}[-\.\s]?)?(\(\d{3}\)|\d{3})[-\.\s]?\d{3}[-\.\s]?\d{4}"
-    matches = re.findall(phone_regex, text)
-    # Post-process matches to return a clean number if found
-    if matches:
-        # The regex might return tuples if grouping is used for optional parts like country code
-        # We want to join them and return the first full match
-        for match in matches:
-            if isinstance(match, tuple):
-                full_match_str = "".join(m for m in match if m) # Join non-empty parts of the tuple
-                # Further clean up common separators from the found string
-                return re.sub(r"[^0-9]", "", full_match_str)
-            elif isinstance(match, str) and match.strip(): # If it's a direct string match
-                 return re.sub(r"[^0-9]", "", match) # Clean it
+    match = _PHONE_RE.search(text) # Stops at the first number instead of scanning the whole text
+    if match:
+        # Use the whole match (country code, area code and number) and strip separators
+        return _NON_DIGIT.sub("", match.group(0))
     return "Phone Not Found"
 
-def extract_education(text_doc): # Expects a spaCy Doc object
-    """Extracts education-related text using keyword matching and sentence analysis (rudimentary)."""
-    if text_doc is None:
-        return "Education Not Found (No document processed)"
-
-    education_keywords = [
-        'education', 'university', 'college', 'institute', 'bachelor', 'master', 'phd',
-        'degree', 'qualification', 'academic', 'school', 'cgpa', 'gpa'
-    ]
-    education_section = []
+def extract_education(text): # Expects raw text
+    """Extracts education-related lines using keyword matching (rudimentary)."""
+    if text is None:
+        return "Education Not Found (No text provided)"
 
-    # Simple approach: look for sentences containing education keywords
+    # Simple approach: keep lines containing education keywords
     # More advanced: identify sections titled "Education" or similar
-    for sent in text_doc.sents:
-        sent_text = sent.text.lower()
-        if any(keyword in sent_text for keyword in education_keywords):
-            education_section.append(sent.text.strip())
+    education_section = [line.strip() for line in text.splitlines() if _EDUCATION_RE.search(line)]
 
     return "\n".join(education_section) if education_section else "Education information not clearly found"
 
-def extract_skills(text_doc, skills_list=None): # Expects a spaCy Doc object
-    """Extracts skills using spaCy's Matcher."""
-    if text_doc is None:
-        return ["Skills Not Found (No document processed)"]
-
-    # Initialize Matcher with the shared vocab
-    matcher = Matcher(nlp.vocab)
-
-    # Default skills list if none provided (can be expanded significantly)
-    if skills_list is None:
-        skills_list = [
-            "python", "java", "c++", "javascript", "react", "angular", "vue", "node.js",
-            "sql", "nosql", "mongodb", "postgresql", "mysql",
-            "aws", "azure", "gcp", "docker", "kubernetes",
-            "machine learning", "deep learning", "tensorflow", "pytorch", "keras", "scikit-learn",
-            "data analysis", "data science", "pandas", "numpy", "matplotlib", "seaborn",
-            "natural language processing", "nlp", "spacy", "nltk",
-            "agile", "scrum", "jira", "git", "communication", "problem solving", "teamwork"
-        ]
-
-    # Create patterns for the Matcher
-    # Simple phrase matching for now. Can be extended with more complex patterns.
-    for skill in skills_list:
-        # Handle multi-word skills by creating a list of token patterns
-        pattern = []
-        for token in skill.split():
-            pattern.append({"LOWER": token}) # Match lowercased token
-        matcher.add(skill.upper(), [pattern]) # Use skill name as pattern ID
-
-    matches = matcher(text_doc)
-
-    found_skills = set() # Use a set to store unique skills
-    for match_id, start, end in matches:
-        skill_name = nlp.vocab.strings[match_id] # Get the skill name (ID)
-        found_skills.add(skill_name.lower()) # Add the matched skill (original from skills_list)
-
-    return list(found_skills) if found_skills else ["No specific skills found from the predefined list"]
-
-
-def parse_resume(file_path):
-    """Main function to parse resume and extract information."""
-    # Load spaCy model if not already loaded (critical for other functions)
-    global nlp
-    if nlp is None:
-        try:
-            nlp = spacy.load('en_core_web_sm')
-            print("spaCy model 'en_core_web_sm' loaded successfully for parsing.")
-        except OSError:
-            print("CRITICAL: Failed to load spaCy model 'en_core_web_sm'. Make sure it's installed.")
-            print("Attempting to download and load en_core_web_sm...")
-            try:
-                spacy.cli.download('en_core_web_sm')
-                nlp = spacy.load('en_core_web_sm')
-                print("Successfully downloaded and loaded 'en_core_web_sm'.")
-            except Exception as e:
-                print(f"Still failed to load spaCy model after download attempt: {e}")
-                return {"error": "spaCy model 'en_core_web_sm' not available or failed to download."}
-        except Exception as e: # Catch any other spacy.load exception
-            print(f"An unexpected error occurred while loading spaCy model: {e}")
-            return {"error": "Unexpected error loading spaCy model."}
-
-
-    text = extract_text_from_file(file_path)
-    if not text:
-        return {"error": f"Could not extract text from {file_path}"}
-
-    # Process the text with spaCy to get a Doc object
-    # This should happen after nlp is confirmed to be loaded
-    if nlp is None : # Double check, should not happen if above logic is correct
-        return {"error": "spaCy nlp object not initialized before processing text."}
-
-    doc = nlp(text)
-
-    name = extract_name(doc)
-    email = extract_email(text) # Email regex works on raw text
-    phone = extract_phone(text) # Phone regex works on raw text
-    education = extract_education(doc)
-    skills = extract_skills(doc) # Pass the Doc object
+def extract_skills(text, skills_list=None): # Expects raw text
+    """
+    Extracts skills with a single compiled regex scan over the raw text.
+    Returns a frozenset of lowercased skill names (empty if none were found).
+    """
+    if text is None:
+        return frozenset()
+
+    return frozenset(find_skills(text, skills_list))
 
+
+def _build_resume_data(extracted, nlp, header_doc=None):
+    """Assembles the parsed fields from extract_text_from_file's output."""
+    text = extracted["text"]
     return {
         "text": text,
-        "name": name,
-        "email": email,
-        "phone": phone,
-        "education": education,
-        "skills": skills,
-        "no_of_pages": "N/A (pdfminer specific)" # Placeholder, as pyresparser provided this
+        "name": extract_name(text, nlp, header_doc),
+        "email": extract_email(text), # Email regex works on raw text
+        "phone": extract_phone(text), # Phone regex works on raw text
+        "education": extract_education(text), # Education keywords are matched per line
+        "skills": extract_skills(text), # Skills regex works on raw text
+        "no_of_pages": extracted["n_pages"] if extracted["n_pages"] is not None else "N/A"
     }
 
+def parse_resume(source, nlp, ext=None):
+    """Main function to parse resume and extract information.
+
+    `source` is a file path or binary file-like object; `ext` overrides format detection.
+    `nlp` is a loaded spaCy pipeline (see load_spacy_model); callers own its lifetime
+    so it can be loaded once and shared across calls.
+    """
+    if nlp is None:
+        return {"error": "spaCy model 'en_core_web_sm' not available or failed to download."}
+
+    extracted = extract_text_from_file(source, ext)
+    if not extracted or not extracted["text"]:
+        return {"error": f"Could not extract text from {_source_name(source)}"}
+
+    # spaCy only runs on the resume header, inside extract_name
+    return _build_resume_data(extracted, nlp)
+
+# spaCy pipeline owned by a parse_resumes worker process (set by _init_parse_worker)
+_worker_nlp = None
+
+def _init_parse_worker(model_name):
+    """
+    Process pool initializer: loads spaCy once per worker instead of once per resume.
+    Never downloads (parse_resumes does that once up front); on failure every resume
+    in this worker gets parse_resume's model error.
+    """
+    global _worker_nlp
+    try:
+        _worker_nlp = _load_trimmed(model_name)
+    except Exception as e:
+        print(f"Worker failed to load spaCy model '{model_name}': {e}")
+        _worker_nlp = None
+
+def _parse_resume_batch_in_worker(sources_with_exts):
+    """Parses one batch, running all resume headers through a single nlp.pipe call."""
+    if _worker_nlp is None:
+        return [parse_resume(source, None) for source, _ in sources_with_exts]
+
+    results = [None] * len(sources_with_exts)
+    parsed = [] # (index, extracted) for resumes with text
+    for i, (source, ext) in enumerate(sources_with_exts):
+        extracted = extract_text_from_file(source, ext)
+        if not extracted or not extracted["text"]:
+            results[i] = {"error": f"Could not extract text from {_source_name(source)}"}
+        else:
+            parsed.append((i, extracted))
+
+    headers = ["\n".join(_name_header(extracted["text"])) for _, extracted in parsed]
+    header_docs = _worker_nlp.pipe(headers, batch_size=max(len(headers), 1))
+    for (i, extracted), header_doc in zip(parsed, header_docs):
+        results[i] = _build_resume_data(extracted, _worker_nlp, header_doc)
+    return results
+
+def parse_resumes(sources, workers=None, batch_size=8, model_name='en_core_web_sm', exts=None):
+    """
+    Parses several resumes in parallel worker processes (one per CPU by default).
+    Each worker receives up to `batch_size` resumes per task to keep inter-process overhead low,
+    and runs that task's resume headers through spaCy as one nlp.pipe batch.
+    `sources` are file paths or picklable binary streams such as io.BytesIO. The format is taken
+    from the path or the stream's `.name`; for unnamed streams pass `exts`, a list of extensions
+    (e.g. ".pdf", or None to detect) in the same order as `sources`.
+    Results are returned in the same order as `sources`. The model is loaded (and downloaded
+    if missing) once here first; if that fails every result is the model error dict.
+    """
+    sources = list(sources)
+    exts = [None] * len(sources) if exts is None else list(exts)
+    if len(exts) != len(sources):
+        raise ValueError("exts must have one entry per source")
+    if not sources:
+        return []
+    # Fail fast, and keep workers from racing to download the model
+    if load_spacy_model(model_name) is None:
+        return [parse_resume(source, None) for source in sources]
+    sources_with_exts = list(zip(sources, exts))
+    batches = [sources_with_exts[i:i + batch_size] for i in range(0, len(sources_with_exts), batch_size)]
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_parse_worker,
+                             initargs=(model_name,)) as executor:
+        return [result for batch in executor.map(_parse_resume_batch_in_worker, batches) for result in batch]
+
 if __name__ == '__main__':
     # Example Usage (for testing this module directly)
     print("Resume Parser Module - Running Test")
@@ -227,7 +327,7 @@ if __name__ == '__main__':
         test_docx_content.save("dummy_test_resume.docx")
         print("Created dummy_test_resume.docx")
 
-        data_docx = parse_resume("dummy_test_resume.docx")
+        data_docx = parse_resume("dummy_test_resume.docx", load_spacy_model())
         if data_docx and "error" not in data_docx:
             print("\n--- Parsed DOCX Data (dummy_test_resume.docx) ---")
             for key, value in data_docx.items():
@@ -0,0 +1,41 @@
+import re
+from functools import lru_cache
+
+# Default skills vocabulary shared by the resume parser and the JD matcher (can be expanded significantly)
+PREDEFINED_SKILLS = (
+    "python", "java", "c++", "javascript", "react", "angular", "vue", "node.js",
+    "sql", "nosql", "mongodb", "postgresql", "mysql",
+    "aws", "azure", "gcp", "docker", "kubernetes",
+    "machine learning", "deep learning", "tensorflow", "pytorch", "keras", "scikit-learn",
+    "data analysis", "data science", "pandas", "numpy", "matplotlib", "seaborn",
+    "natural language processing", "nlp", "spacy", "nltk",
+    "agile", "scrum", "jira", "git", "communication", "problem solving", "teamwork",
+)
+
+@lru_cache(maxsize=32)
+def build_skills_regex(skills_list):
+    """
+    Compiles a skills list into a single case-insensitive alternation.
+    Longer skills are tried first, words of multi-word skills may be separated by any whitespace,
+    and lookarounds stand in for \\b so skills ending in symbols (c++, node.js) still match.
+    Memoized, so a given list is only compiled once; pass it as a tuple.
+    Blank entries are ignored; returns None if no skills remain (an empty alternation would match everywhere).
+    """
+    alternatives = [r"\s+".join(re.escape(token) for token in skill.split())
+                    for skill in sorted(skills_list, key=len, reverse=True) if skill.strip()]
+    if not alternatives:
+        return None
+    return re.compile(r"(?<!\w)(?:" + "|".join(alternatives) + r")(?!\w)", re.IGNORECASE)
+
+# Built once per process at import time
+SKILLS_RE = build_skills_regex(PREDEFINED_SKILLS)
+
+def find_skills(text, skills_list=None):
+    """
+    Returns the set of skills found in `text`, lowercased and with internal whitespace collapsed
+    so e.g. "Machine\\nLearning" maps back to "machine learning".
+    """
+    skills_re = SKILLS_RE if skills_list is None else build_skills_regex(tuple(skills_list))
+    if skills_re is None:
+        return set()
+    return set(" ".join(match.lower().split()) for match in skills_re.findall(text))